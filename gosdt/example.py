@@ -8,7 +8,8 @@ from gosdt import GOSDT
 
 # read the dataset
 df = pd.read_csv("experiments/datasets/fico.csv", sep=";")
-X, y = df.iloc[:,:-1].values, df.iloc[:,-1].values
+values = df.values # every column is an integer, so this is a view of the frame's data rather than a copy
+X, y = values[:,:-1], values[:,-1]
 h = df.columns[:-1]
 
 # GBDT parameters for threshold and lower bound guesses
@@ -1,7 +1,7 @@
 import operator
 
 from math import ceil, log
-from numpy import array, argsort, hstack, dtype, issubdtype, isnan, nan, int64, int32, float64, float32
+from numpy import array, argsort, hstack, zeros, dtype, issubdtype, isnan, nan, int64, int32, float64, float32
 from pandas import isnull
 from sortedcontainers import SortedList, SortedSet, SortedDict
 from sklearn.ensemble import RandomForestClassifier
@@ -218,33 +218,27 @@ class Encoder:
         if len(data.shape) <= 1:
             data = array([[data[i]] for i in range(data.shape[0])])
         (n, m) = data.shape
-        encoded = []
-        for i in range(n):
-            if self.mode == "tree":
-                # print(data[i,:], "=>", self.tree.encode(data[i,:]))
-                encoded.append(self.tree.encode(data[i,:]))
+        if self.mode == "tree":
+            return array([ self.tree.encode(data[i,:]) for i in range(n) ])
+
+        # Each encoder produces one column of the output, computed over the whole column of samples at once
+        width = sum(len(self.encoders[j]) for j in range(m) if self.encoders[j] != None)
+        encoded = zeros((n, width), dtype=int)
+        offset = 0
+        for j in range(m):
+            encoders = self.encoders[j]
+            if encoders == None:
                 continue
-            row = []                
-            for j in range(m):
-                encoders = self.encoders[j]
-                if encoders == None:
-                    continue
-                cells = []
-                for encoder in encoders:
-                    if isnan(data[i, j]):
-                        cell = 0
-                    elif "radial_index" in encoder:
-                        try:
-                            value = int(data[i, j] * pow(self.base, -encoder["radial_index"])) % self.base
-                        except:
-                            print(data[i, j], pow(self.base, -encoder["radial_index"]))
-                        cell = int(encoder['relation'](value, encoder['reference']))
-                    else:
-                        cell = int(encoder['relation'](data[i, j], encoder['reference']))
-                    cells.append(cell)
-                row += cells
-            encoded.append(row)
-        return array(encoded)
+            defined = ~isnull(data[:, j]) # Undefined values are encoded as 0 by every encoder
+            values = data[defined, j]
+            for encoder in encoders:
+                if "radial_index" in encoder:
+                    radial_values = (values * pow(self.base, -encoder["radial_index"])).astype(int) % self.base
+                    encoded[defined, offset] = encoder['relation'](radial_values, encoder['reference'])
+                else:
+                    encoded[defined, offset] = encoder['relation'](values, encoder['reference'])
+                offset += 1
+        return encoded
 
     def decode(self, data):
         if len(data.shape) <= 1:
@@ -196,7 +196,7 @@ class GOSDT:
         """
         if self.tree is None:
             raise Exception("Error: Model not yet trained")
-        return self.tree.confusion(self.predict(X), y, weight=weight)
+        return self.tree.confusion(X, y, weight=weight)
 
     def __len__(self):
         """
@@ -274,10 +274,11 @@ class GOSDT:
         trains a model using the GOSDT pure Python implementation modified from OSDT
         """
 
-        encoder = Encoder(X.values[:,:], header=X.columns[:], mode="complete", target=y[y.columns[0]])
+        values = X.values # Materialize the samples once for both fitting and applying the encoder
+        encoder = Encoder(values, header=X.columns[:], mode="complete", target=y[y.columns[0]])
         headers = encoder.headers
 
-        X = pd.DataFrame(encoder.encode(X.values[:,:]), columns=encoder.headers)
+        X = pd.DataFrame(encoder.encode(values), columns=encoder.headers)
         y = y.reset_index(drop=True)
 
         # Translation of Variables:
@@ -13,6 +13,11 @@ from sklearn.model_selection import KFold, cross_val_score, train_test_split
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn import metrics
 
+try:
+    from numba import njit, prange # Optional JIT compiler used to accelerate cut
+except ImportError:
+    njit = None
+
 
 # fit the tree using gradient boosted classifier
 def fit_boosted_tree(X, y, n_est=10, lr=0.1, d=1):
@@ -23,17 +28,44 @@ def fit_boosted_tree(X, y, n_est=10, lr=0.1, d=1):
     return clf, out
 
 
+if not njit is None:
+    # fill the columns of out with the threshold indicators of each feature of X, features run in parallel
+    @njit(parallel=True, cache=True)
+    def cut_columns(X, offsets, thresholds, out):
+        for j in prange(X.shape[1]):
+            for k in range(offsets[j], offsets[j+1]):
+                t = thresholds[k]
+                for i in range(X.shape[0]):
+                    out[i, k] = 0 if X[i, j] > t else 1
+
+
 # perform cut on the dataset
 def cut(X, ts):
-    df = X.copy()
     colnames = X.columns
-    for j in range(len(ts)):
-        for s in range(len(ts[j])):
-            X[colnames[j]+'<='+str(ts[j][s])] = 1
-            k = df[colnames[j]] > ts[j][s]
-            X.loc[k, colnames[j]+'<='+str(ts[j][s])] = 0
-        X = X.drop(colnames[j], axis=1)
-    return X
+    widths = [len(ts[j]) for j in range(len(ts))]
+    # binary indicators need a single byte each; column-major so that every threshold column is contiguous
+    # both while it is written and once it is wrapped as a column block of the frame
+    X_cut = np.empty((X.shape[0], sum(widths)), dtype=np.uint8, order='F')
+    names = [colnames[j]+'<='+str(t) for j in range(len(ts)) for t in ts[j]]
+    values = X.values[:, :len(ts)] if not njit is None else None
+    if not values is None and values.dtype.kind in "biuf":
+        offsets = np.cumsum([0] + widths)
+        cut_columns(values, offsets, np.array([t for tj in ts for t in tj], dtype=float), X_cut)
+    else:
+        offset = 0
+        for j in range(len(ts)):
+            if widths[j] == 0:
+                continue
+            # one broadcast comparison per feature, written straight into the output buffer
+            # (computed as "not greater than" so that missing values map to 1)
+            block = X_cut[:, offset:offset+widths[j]]
+            np.greater(X[colnames[j]].values[:, None], np.array(ts[j])[None, :], out=block)
+            np.logical_not(block, out=block)
+            offset += widths[j]
+    X_cut = pd.DataFrame(X_cut, columns=names, index=X.index, copy=False)
+    if len(ts) < X.shape[1]:
+        X_cut = pd.concat([X.drop(colnames[:len(ts)], axis=1), X_cut], axis=1)
+    return X_cut
 
 
 # compute the thresholds
@@ -41,16 +73,17 @@ def get_thresholds(X, y, n_est, lr, d, backselect=True):
     # got a complaint here...
     y = np.ravel(y)
     # X is a dataframe
+    # the boosted trees split on float32 features, so convert once here instead of inside every fit,
+    # and cut the data at the same precision that the thresholds were learned at
+    X = X.astype(np.float32)
     clf, out = fit_boosted_tree(X, y, n_est, lr, d)
     #print('acc:', out, 'acc cv:', score.mean())
+    # collect the splits of all estimators once, then group them by feature
+    f = np.concatenate([estimator.tree_.feature for estimator in clf.estimators_[:,0]])
+    t = np.concatenate([estimator.tree_.threshold for estimator in clf.estimators_[:,0]])
     thresholds = []
     for j in range(X.shape[1]):
-        tj = np.array([])
-        for i in range(len(clf.estimators_)):
-            f = clf.estimators_[i,0].tree_.feature
-            t = clf.estimators_[i,0].tree_.threshold
-            tj = np.append(tj, t[f==j])
-        tj = np.unique(tj)
+        tj = np.unique(t[f==j])
         thresholds.append(tj.tolist())
 
     X_new = cut(X, thresholds)
@@ -58,7 +91,7 @@ def get_thresholds(X, y, n_est, lr, d, backselect=True):
     #print('acc','1:', out1, 'acc1 cv:', scorep.mean())
 
     outp = 1
-    Xp = X_new.copy()
+    Xp = X_new # every backward step drops into a new frame, so X_new itself is never modified
     clfp = clf1
     itr=0
     if backselect:
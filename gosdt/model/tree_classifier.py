@@ -2,9 +2,14 @@ import pandas as pd
 import numpy as np
 from json import dumps, JSONEncoder
 from numpy import array
-from operator import add, eq, ge
+from operator import add, eq, ge, le, gt, lt
 from sklearn.metrics import confusion_matrix, accuracy_score, balanced_accuracy_score
 
+try:
+    from numba import njit, prange # Optional JIT compiler used to accelerate prediction
+except ImportError:
+    njit = None
+
 # Supporting Override for Converting Numpy Types into Python Values
 class NumpyEncoder(JSONEncoder):
     def default(self, obj):
@@ -17,6 +22,35 @@ class NumpyEncoder(JSONEncoder):
         else:
             return super(NumpyEncoder, self).default(obj)
 
+# Relational operators supported by the decision nodes, indexed by the code stored in the flattened tree
+RELATIONS = ["==", ">=", "<=", ">", "<"]
+OPERATORS = [eq, ge, le, gt, lt]
+
+if not njit is None:
+    # Compiled on first use, later processes reload the machine code from the on-disk cache (__pycache__)
+    @njit(parallel=True, cache=True)
+    def traverse(X, feature, relation, reference, true, false, leaf, out):
+        """
+        Compiled equivalent of TreeClassifier.__predict_leaves__ for numerical samples
+        Each row walks the flattened tree independently, rows are distributed across threads
+        """
+        for i in prange(X.shape[0]):
+            node = 0
+            while leaf[node] < 0:
+                value = X[i, feature[node]]
+                code = relation[node]
+                if code == 0:
+                    branch = value == reference[node]
+                elif code == 1:
+                    branch = value >= reference[node]
+                elif code == 2:
+                    branch = value <= reference[node]
+                elif code == 3:
+                    branch = value > reference[node]
+                else:
+                    branch = value < reference[node]
+                node = true[node] if branch else false[node]
+            out[i] = leaf[node]
 
 class TreeClassifier:
     """
@@ -29,6 +63,7 @@ class TreeClassifier:
     def __init__(self, source, encoder=None, X=None, y=None):
         self.source = source # The classifier stored in a recursive dictionary structure
         self.encoder = encoder # Optional encoder / decoder unit to run before / after prediction
+        self.__flatten__() # Array representation of the classifier used for batched prediction
         if not X is None and not y is None: # Original training features and labels to fill in missing training loss values
             self.__initialize_training_loss__(X, y)
 
@@ -38,15 +73,14 @@ class TreeClassifier:
         Compares every prediction y_hat against the labels y, then incorporates the misprediction into the stored loss values
         This is used when parsing models from an algorithm that doesn't provide the training loss in the out put
         """
-        for node in self.__all_leaves__():
-            node["loss"] = 0.0
         (n, m) = X.shape
-        for i in range(n):
-            node = self.__find_leaf__(X.values[i,:])
-            label = y.values[i,-1]
-            weight = 1 / n
-            if node["prediction"] != label:
-                node["loss"] += weight
+        leaves = self.__predict_leaves__(X.values)
+        mispredicted = self.__predictions__[leaves] != y.values[:,-1]
+        # Each misprediction contributes a weight of 1 / n to the loss of the leaf that made it
+        losses = np.bincount(leaves[mispredicted], minlength=len(self.__leaf_nodes__)) / n
+        for node, loss in zip(self.__leaf_nodes__, losses):
+            node["loss"] = float(loss)
+        self.__confidences__ = 1 - losses
         return
 
     def __find_leaf__(self, sample):
@@ -91,6 +125,139 @@ class TreeClassifier:
                 else:
                     raise "Unsupported relational operator {}".format(node["relation"])
 
+    def __flatten__(self):
+        """
+        Numbers every node of the source in breadth-first order and stores the classifier as a set of parallel arrays indexed by node id
+        This lets a whole batch of samples descend the tree together, one level at a time
+        """
+        nodes = [self.source]
+        depths = [1]
+        self.__leaf_nodes__ = []
+        feature, relation, reference, true, false, leaf = [], [], [], [], [], []
+        index = 0
+        while index < len(nodes):
+            node = nodes[index]
+            if "prediction" in node:
+                # Leaves refer back to themselves and carry their position in the leaf list
+                feature.append(0)
+                relation.append(0)
+                reference.append(0)
+                true.append(index)
+                false.append(index)
+                leaf.append(len(self.__leaf_nodes__))
+                self.__leaf_nodes__.append(node)
+            else:
+                if not node["relation"] in RELATIONS:
+                    raise Exception("Unsupported relational operator {}".format(node["relation"]))
+                feature.append(node["feature"])
+                relation.append(RELATIONS.index(node["relation"]))
+                reference.append(node["reference"])
+                true.append(len(nodes))
+                nodes.append(node["true"])
+                false.append(len(nodes))
+                nodes.append(node["false"])
+                depths += [depths[index] + 1, depths[index] + 1]
+                leaf.append(-1)
+            index += 1
+        # Index arrays use the narrowest integer type able to hold their values (leaves need room for the -1 sentinel)
+        self.__feature__ = array(feature, dtype=np.min_scalar_type(max(feature)))
+        self.__relation__ = array(relation, dtype=np.uint8)
+        self.__reference__ = array(reference)
+        if not self.__reference__.dtype.kind in "biuf":
+            self.__reference__ = array(reference, dtype=object)
+        self.__true__ = array(true, dtype=np.min_scalar_type(len(nodes)))
+        self.__false__ = array(false, dtype=np.min_scalar_type(len(nodes)))
+        self.__leaf__ = array(leaf, dtype=np.min_scalar_type(-len(self.__leaf_nodes__)))
+        self.__depth__ = max(depths)
+        # Per-leaf lookup tables so that batched outputs are a single gather by leaf position
+        self.__predictions__ = array([ node["prediction"] for node in self.__leaf_nodes__ ])
+        self.__confidences__ = None # Built on first use since the leaf losses may be filled in after construction
+        self.__specialized__ = None # Kernel generated for this particular tree by compile()
+
+    def __specialize__(self, index, indentation):
+        """
+        Parameters
+        ---
+        index : natural number
+            id of the node from which to generate code
+        indentation : natural number
+            level of indentation of the generated statements
+
+        Returns
+        ---
+        list : lines of Python source that return the leaf position reached by the sample x from the given node
+        """
+        prefix = "    " * indentation
+        if self.__leaf__[index] >= 0:
+            return ["{}return {}".format(prefix, self.__leaf__[index])]
+        return ["{}if x[{}] {} {!r}:".format(prefix, self.__feature__[index], RELATIONS[self.__relation__[index]], self.__reference__[index].item())] \
+            + self.__specialize__(self.__true__[index], indentation + 1) \
+            + ["{}else:".format(prefix)] \
+            + self.__specialize__(self.__false__[index], indentation + 1)
+
+    def compile(self):
+        """
+        Generates a traversal kernel specialized to the structure of this tree, with every split inlined as a constant comparison
+        Subsequent calls to predict, confidence and score on numerical samples use this kernel
+        This costs one JIT compilation per tree, which pays off when the same model classifies many batches
+        Has no effect if Numba is not installed or the tree splits on non-numerical references
+
+        Returns
+        ---
+        TreeClassifier : this classifier
+        """
+        if njit is None or not self.__reference__.dtype.kind in "biuf":
+            return self
+        source = "\n".join(
+            ["@njit", "def classify(x):"] + self.__specialize__(0, 1) + [
+            "@njit(parallel=True)",
+            "def kernel(X, out):",
+            "    for i in prange(X.shape[0]):",
+            "        out[i] = classify(X[i])"])
+        namespace = { "njit": njit, "prange": prange, "inf": float("inf"), "nan": float("nan") }
+        exec(source, namespace)
+        self.__specialized__ = namespace["kernel"]
+        return self
+
+    def __predict_leaves__(self, X):
+        """
+        Parameters
+        ---
+        X : array-like, shape = [n_samples by m_features]
+            a matrix where each row is a sample to be classified
+
+        Returns
+        ---
+        array-like, shape = [n_samples] : the position (in the leaf list) of the leaf by which each sample is classified
+        """
+        (n, m) = X.shape
+        if not self.__specialized__ is None and X.dtype.kind in "biuf":
+            leaves = np.empty(n, dtype=self.__leaf__.dtype)
+            self.__specialized__(X, leaves)
+            return leaves
+        if not njit is None and X.dtype.kind in "biuf" and self.__reference__.dtype.kind in "biuf":
+            leaves = np.empty(n, dtype=self.__leaf__.dtype)
+            traverse(X, self.__feature__, self.__relation__, self.__reference__,
+                self.__true__, self.__false__, self.__leaf__, leaves)
+            return leaves
+
+        node = np.zeros(n, dtype=int)
+        for _ in range(self.__depth__ - 1):
+            active = np.flatnonzero(self.__leaf__[node] < 0) # Samples that have not yet reached a leaf
+            if active.size == 0:
+                break
+            current = node[active]
+            values = X[active, self.__feature__[current]]
+            references = self.__reference__[current]
+            relations = self.__relation__[current]
+            branch = np.zeros(active.size, dtype=bool)
+            for code, compare in enumerate(OPERATORS):
+                selected = relations == code
+                if selected.any():
+                    branch[selected] = compare(values[selected], references[selected])
+            node[active] = np.where(branch, self.__true__[current], self.__false__[current])
+        return self.__leaf__[node]
+
     def __all_leaves__(self):
         """
         Returns
@@ -147,15 +314,12 @@ class TreeClassifier:
         ---
         array-like, shape = [n_sampels by 1] : a column where each element is the prediction associated with each row
         """
+        X = X.values
         if not self.encoder is None: # Perform an encoding if an encoding unit is specified
-            X = pd.DataFrame(self.encoder.encode(X.values[:,:]), columns=self.encoder.headers)
-        
-        predictions = []
-        (n, m) = X.shape
-        for i in range(n):
-            prediction, _ = self.classify(X.values[i,:])
-            predictions.append(prediction)
-        return array(predictions)
+            X = self.encoder.encode(X)
+
+        leaves = self.__predict_leaves__(X)
+        return self.__predictions__[leaves]
 
     def confidence(self, X):
         """
@@ -172,15 +336,14 @@ class TreeClassifier:
         ---
         array-like, shape = [n_samples by 1] : a column where each element is the conditional probability of each prediction (conditioned only on the features that were used in prediction)
         """
+        X = X.values
         if not self.encoder is None:
-            X = pd.DataFrame(self.encoder.encode(X.values[:,:]), columns=self.encoder.headers)
+            X = self.encoder.encode(X)
 
-        conditional_probabilities = []
-        (n, m) = X.shape
-        for i in range(n):
-            _, conditional_probability = self.classify(X.values[i,:])
-            conditional_probabilities.append(conditional_probability)
-        return array(conditional_probabilities)
+        leaves = self.__predict_leaves__(X)
+        if self.__confidences__ is None:
+            self.__confidences__ = array([ 1 - node["loss"] for node in self.__leaf_nodes__ ])
+        return self.__confidences__[leaves]
     
     
     def error(self, X, y, weight=None):
@@ -237,7 +400,7 @@ class TreeClassifier:
         ---
         matrix-like, shape = [k_classes by k_classes] : the confusion matrix of all classes present in the dataset
         """
-        return confusion_matrix(y, self.predict(X, y, weight), sample_weight=weight)
+        return confusion_matrix(y, self.predict(X), sample_weight=weight)
 
     def __len__(self):
         """
@@ -253,16 +416,7 @@ class TreeClassifier:
         ---
         natural number : The number of terminal nodes present in this tree
         """
-        leaves_counter = 0
-        nodes = [self.source]
-        while len(nodes) > 0:
-            node = nodes.pop()
-            if "prediction" in node:
-                leaves_counter += 1
-            else:
-                nodes.append(node["true"])
-                nodes.append(node["false"])
-        return leaves_counter
+        return len(self.__leaf_nodes__)
     
     def nodes(self):
         """
@@ -270,17 +424,7 @@ class TreeClassifier:
         ---
         natural number : The number of nodes present in this tree
         """
-        nodes_counter = 0
-        nodes = [self.source]
-        while len(nodes) > 0:
-            node = nodes.pop()
-            if "prediction" in node:
-                nodes_counter += 1
-            else:
-                nodes_counter += 1
-                nodes.append(node["true"])
-                nodes.append(node["false"])
-        return nodes_counter
+        return len(self.__leaf__)
 
 
     def features(self):
@@ -316,7 +460,7 @@ class TreeClassifier:
         natural number : the length of the longest decision path in this tree. A single-node tree will return 1.
         """
         if node is None:
-            node = self.source
+            return self.__depth__
         if "prediction" in node:
             return 1
         else: